@@ -3,18 +3,35 @@
 # per-tool inputs/outputs, API usage counter, and ethical scraper.
 # Author: RuralJoe + GPT-5 Thinking
 
+import atexit
 import os
 import time
 import traceback
 import io
+import ipaddress
+import re
+import shutil
+import socket
+import tempfile
+from html.parser import HTMLParser
+import hashlib
+import json
+import random
+import threading
+import importlib.util
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urljoin, urlsplit
 
 import pandas as pd
 import requests
-from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from bs4 import BeautifulSoup, SoupStrainer
 
 import streamlit as st
 from dotenv import load_dotenv
 import google.generativeai as genai
+from google.api_core import exceptions as google_exceptions
 
 # =========================
 # ===== CONFIG / SETUP =====
@@ -32,17 +49,22 @@ load_dotenv()
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY") or st.secrets.get("GEMINI_API_KEY", None)
 MODEL_NAME = "gemini-2.5-flash"  # adjust if needed
 
-_gemini_client = None
-if GEMINI_API_KEY:
+@st.cache_resource
+def _get_gemini_client(api_key: str | None, model_name: str):
+    """Build the Gemini client once per process instead of on every Streamlit rerun."""
+    if not api_key:
+        print("[WARN] GEMINI_API_KEY is not set; Gemini tools will be unavailable.")
+        return None
     try:
-        genai.configure(api_key=GEMINI_API_KEY)
-        _gemini_client = genai.GenerativeModel(MODEL_NAME)
+        genai.configure(api_key=api_key)
+        client = genai.GenerativeModel(model_name)
         print("[OK] Gemini client initialized")
+        return client
     except Exception as e:
         print(f"[ERROR] Failed to initialize Gemini client: {e}")
-        _gemini_client = None
-else:
-    print("[WARN] GEMINI_API_KEY is not set; Gemini tools will be unavailable.")
+        return None
+
+_gemini_client = _get_gemini_client(GEMINI_API_KEY, MODEL_NAME)
 
 def gemini_available() -> bool:
     return _gemini_client is not None
@@ -54,21 +76,317 @@ if "api_calls" not in st.session_state:
 if "outputs" not in st.session_state:
     st.session_state.outputs = {}  # key -> str or pd.DataFrame
 
-def _count_api_call(ok: bool):
-    if ok:
-        st.session_state.api_calls += 1
+GEMINI_MAX_WORKERS = 2  # default concurrent Gemini requests; low because free/entry tiers cap concurrency hard
+GEMINI_CACHE_DIR = ".gemini_cache"  # on-disk prompt -> response cache, shared across sessions
+GEMINI_CACHE_TTL = 86400  # seconds a cached response stays valid
+GEMINI_MAX_RETRIES = 5  # retries for rate-limit / overload errors, with exponential backoff
+GEMINI_MAX_BACKOFF = 60  # seconds; cap per wait, so the retries span a per-minute quota window
+# TooManyRequests covers every 429: gRPC raises its ResourceExhausted subclass, REST the base class.
+_RETRYABLE_ERRORS = (google_exceptions.TooManyRequests, google_exceptions.ServiceUnavailable)
+
+_RETRY_IN_RE = re.compile(r"retry in (\d+(?:\.\d+)?)\s*s", re.I)
+
+def _retry_after(error: Exception) -> float | None:
+    """Server-suggested wait from a 429 (RetryInfo detail or 'retry in Ns' message), if any."""
+    for detail in getattr(error, "details", None) or ():
+        delay = getattr(detail, "retry_delay", None)
+        if delay is None:
+            continue
+        if hasattr(delay, "total_seconds"):  # proto-plus hands Durations back as timedelta
+            return delay.total_seconds()
+        return delay.seconds + delay.nanos / 1e9
+    m = _RETRY_IN_RE.search(str(error))
+    return float(m.group(1)) if m else None
+
+def _backoff(attempt: int, error: Exception):
+    """
+    Sleep before retry number attempt + 1: the server's suggested delay when
+    the error carries one, else 4, 8, 16, 32, 60 s; always jittered and capped.
+    """
+    delay = _retry_after(error)
+    if delay is None:
+        delay = 4 * 2 ** attempt
+    time.sleep(min(delay, GEMINI_MAX_BACKOFF) + random.random())
+
+def _count_api_call(n: int):
+    if n:
+        st.session_state.api_calls += n
+
+def _cache_path(prompt: str) -> str:
+    # The model name is part of the key so switching models never serves stale text.
+    key = hashlib.sha256(f"{MODEL_NAME}\n{prompt}".encode("utf-8")).hexdigest()
+    return os.path.join(GEMINI_CACHE_DIR, f"{key}.txt")
+
+def _cache_get(prompt: str) -> str | None:
+    path = _cache_path(prompt)
+    try:
+        if time.time() - os.stat(path).st_mtime > GEMINI_CACHE_TTL:
+            os.remove(path)  # expired entries are dropped, not left to pile up
+            return None
+        with open(path, "r", encoding="utf-8") as f:
+            return f.read()
+    except OSError:
+        return None
+
+def _cache_put(prompt: str, text: str):
+    """Atomic one-file-per-prompt write, so concurrent worker threads can't clash."""
+    path = _cache_path(prompt)
+    tmp = f"{path}.{threading.get_ident()}.tmp"
+    try:
+        os.makedirs(GEMINI_CACHE_DIR, exist_ok=True)
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(text)
+        os.replace(tmp, path)
+    except OSError:
+        pass
 
-def call_gemini(prompt: str) -> str:
-    """Wrapper that calls Gemini and increments usage counter on success."""
+@st.cache_resource
+def _sweep_gemini_cache() -> int:
+    """Once per process, delete cache files (and stray .tmp files) older than the TTL."""
+    cutoff = time.time() - GEMINI_CACHE_TTL
+    removed = 0
+    try:
+        entries = list(os.scandir(GEMINI_CACHE_DIR))
+    except OSError:
+        return 0
+    for entry in entries:
+        try:
+            if entry.stat().st_mtime < cutoff:
+                os.remove(entry.path)
+                removed += 1
+        except OSError:
+            pass
+    return removed
+
+_sweep_gemini_cache()
+
+def _generate(prompt: str, use_cache: bool = True) -> tuple[str, int]:
+    """
+    Gemini call behind the prompt cache. Returns (text, billed_calls) and never
+    touches st.session_state, so it is safe to run from worker threads.
+    429/503s are retried with jittered exponential backoff; errors are never cached.
+    """
     if not gemini_available():
-        return "ERROR: Gemini client not initialized. Set GEMINI_API_KEY."
+        return "ERROR: Gemini client not initialized. Set GEMINI_API_KEY.", 0
+    if use_cache:
+        cached = _cache_get(prompt)
+        if cached is not None:
+            return cached, 0
     try:
-        resp = _gemini_client.generate_content(prompt)
+        for attempt in range(GEMINI_MAX_RETRIES + 1):
+            try:
+                resp = _gemini_client.generate_content(prompt)
+                break
+            except _RETRYABLE_ERRORS as e:
+                if attempt == GEMINI_MAX_RETRIES:
+                    raise
+                _backoff(attempt, e)
         text = (resp.text or "").strip()
-        _count_api_call(True)
-        return text if text else "ERROR: Empty response from model."
     except Exception as e:
-        return f"ERROR: {e}"
+        return f"ERROR: {e}", 0
+    if not text:
+        return "ERROR: Empty response from model.", 1
+    if use_cache:
+        _cache_put(prompt, text)
+    return text, 1
+
+def call_gemini(prompt: str, use_cache: bool = True) -> str:
+    """Wrapper that calls Gemini and increments usage counter on success."""
+    text, n = _generate(prompt, use_cache)
+    _count_api_call(n)
+    return text
+
+def call_gemini_many(prompts: list[str]) -> list[str]:
+    """
+    Run several prompts concurrently (the calls are network-bound) and return
+    the responses in input order. The usage counter is updated once, from the
+    calling thread, because st.session_state is not safe for worker threads.
+    """
+    if not prompts:
+        return []
+    workers = min(st.session_state.get("gemini_concurrency", GEMINI_MAX_WORKERS), len(prompts))
+    with ThreadPoolExecutor(max_workers=workers) as ex:
+        results = list(ex.map(_generate, prompts))
+    _count_api_call(sum(n for _, n in results))
+    return [text for text, _ in results]
+
+def stream_gemini(prompt: str):
+    """
+    Yield response text as Gemini produces it, for st.write_stream. Cached
+    prompts are replayed in one piece; a completed stream is counted as one
+    API call and stored in the prompt cache. 429/503s are retried like
+    _generate's as long as no text has been shown yet.
+    """
+    if not gemini_available():
+        yield "ERROR: Gemini client not initialized. Set GEMINI_API_KEY."
+        return
+    cached = _cache_get(prompt)
+    if cached is not None:
+        yield cached
+        return
+    parts = []
+    for attempt in range(GEMINI_MAX_RETRIES + 1):
+        try:
+            for chunk in _gemini_client.generate_content(prompt, stream=True):
+                # Trailing chunks may carry only a finish reason; .text raises on those.
+                if chunk.parts and chunk.text:
+                    parts.append(chunk.text)
+                    yield chunk.text
+            break
+        except _RETRYABLE_ERRORS as e:
+            # A stream that already produced text can't be restarted without repeating it.
+            if parts or attempt == GEMINI_MAX_RETRIES:
+                yield f"\nERROR: {e}"
+                return
+            _backoff(attempt, e)
+        except Exception as e:
+            yield f"\nERROR: {e}"
+            return
+    _count_api_call(1)
+    if parts:
+        _cache_put(prompt, "".join(parts).strip())
+
+GEMINI_BATCH_SIZE = 8  # default CSV rows packed into one model request by batch tools
+
+def _parse_json_list(text: str, n: int) -> list[str] | None:
+    """Parse a model reply that should be a JSON array of n strings; None if it isn't."""
+    text = text.strip()
+    if text.startswith("```"):
+        text = text.strip("`").removeprefix("json").strip()
+    try:
+        data = json.loads(text)
+    except ValueError:
+        return None
+    # Objects (e.g. {"subject": ..., "body": ...}) would otherwise land in the table as dict reprs.
+    if not isinstance(data, list) or len(data) != n or not all(isinstance(x, str) for x in data):
+        return None
+    return [x.strip() for x in data]
+
+def _build_batch_prompt(preamble: str, chunk: list[dict]) -> str:
+    return (
+        f"{preamble}\n"
+        f"Input (JSON array of {len(chunk)} items):\n"
+        f"{json.dumps(chunk, ensure_ascii=False)}\n"
+        f"Return a JSON array of length {len(chunk)} where element i is the output "
+        "for input item i. Output ONLY valid JSON."
+    )
+
+def call_gemini_batched(preamble: str, items: list[dict], fallback_prompts: list[str],
+                        batch_size: int = GEMINI_BATCH_SIZE) -> list[str]:
+    """
+    Pack batch_size items into each request (preamble + JSON input, JSON array
+    out) so the instructions and round-trip are shared across rows; batches run
+    concurrently via call_gemini_many. Any batch whose reply can't be parsed is
+    redone one row at a time with fallback_prompts; a batch whose request
+    failed outright passes its ERROR to every row instead of multiplying the
+    load on an API that is already refusing requests.
+    """
+    if batch_size <= 1:
+        return call_gemini_many(fallback_prompts)
+
+    starts = range(0, len(items), batch_size)
+    batch_prompts = [_build_batch_prompt(preamble, items[i:i + batch_size]) for i in starts]
+    replies = call_gemini_many(batch_prompts)
+
+    results: list[str | None] = []
+    retry: list[int] = []
+    for i, reply in zip(starts, replies):
+        n = len(items[i:i + batch_size])
+        if reply.startswith("ERROR:"):
+            results.extend([reply] * n)
+            continue
+        parsed = _parse_json_list(reply, n)
+        if parsed is None:
+            retry.extend(range(i, i + n))
+            parsed = [None] * n
+        results.extend(parsed)
+
+    if retry:
+        for idx, text in zip(retry, call_gemini_many([fallback_prompts[j] for j in retry])):
+            results[idx] = text
+    return results
+
+# ---- Gemini Batch API (asynchronous jobs, ~50% of the interactive price) ----
+BATCH_API_MIN_ROWS = 20  # below this the interactive path is faster and the saving negligible
+BATCH_API_MAX_WAIT = 2 * 60  # seconds a run waits on its job before leaving it to "Fetch batch results"
+_BATCH_DONE_STATES = {"JOB_STATE_SUCCEEDED", "JOB_STATE_FAILED", "JOB_STATE_CANCELLED", "JOB_STATE_EXPIRED"}
+
+@st.cache_resource
+def _get_batch_client(api_key: str | None):
+    """The Batch API lives in the newer google-genai SDK; None if it (or a key) is missing."""
+    if not api_key:
+        return None
+    try:
+        from google import genai as genai_sdk
+        return genai_sdk.Client(api_key=api_key)
+    except Exception as e:
+        print(f"[WARN] Gemini Batch API unavailable: {e}")
+        return None
+
+def batch_api_available() -> bool:
+    return _get_batch_client(GEMINI_API_KEY) is not None
+
+def _batch_request_line(key: int, prompt: str) -> str:
+    """One line of a Batch API JSONL input file; key is the row's position."""
+    request = {"contents": [{"role": "user", "parts": [{"text": prompt}]}]}
+    return json.dumps({"key": str(key), "request": request}, ensure_ascii=False) + "\n"
+
+def submit_gemini_batch_job(jsonl_path: str) -> str:
+    """
+    Upload a JSONL request file (see _batch_request_line) and start a Batch
+    API job on it. File input has no inline-request size limit, so any CSV
+    size works. Returns the job name.
+    """
+    client = _get_batch_client(GEMINI_API_KEY)
+    if client is None:
+        raise RuntimeError("Gemini Batch API unavailable (install google-genai).")
+    display_name = f"hustlehub-{int(time.time())}"
+    uploaded = client.files.upload(file=jsonl_path, config={"display_name": display_name, "mime_type": "jsonl"})
+    job = client.batches.create(model=MODEL_NAME, src=uploaded.name, config={"display_name": display_name})
+    return job.name
+
+def wait_gemini_batch_job(name: str, max_wait: float):
+    """Poll a batch job with exponential backoff for up to max_wait seconds; returns its latest state."""
+    client = _get_batch_client(GEMINI_API_KEY)
+    job = client.batches.get(name=name)
+    delay, deadline = 5.0, time.monotonic() + max_wait
+    while job.state.name not in _BATCH_DONE_STATES and time.monotonic() + delay <= deadline:
+        time.sleep(delay)
+        delay = min(delay * 1.5, 60.0)
+        job = client.batches.get(name=name)
+    return job
+
+def _batch_record_text(record: dict) -> str:
+    if record.get("error"):
+        return f"ERROR: {record['error']}"
+    try:
+        parts = record["response"]["candidates"][0]["content"]["parts"]
+    except (KeyError, IndexError, TypeError):
+        return "ERROR: Empty response from model."
+    text = "".join(p.get("text", "") for p in parts).strip()
+    return text or "ERROR: Empty response from model."
+
+def read_gemini_batch_results(job, n: int) -> list[str]:
+    """
+    Responses of a finished job, merged by key into row order (keys 0..n-1).
+    Rows the output file doesn't cover get an ERROR rather than shifting the rest.
+    """
+    if job.state.name != "JOB_STATE_SUCCEEDED":
+        return [f"ERROR: Batch job ended in {job.state.name}."] * n
+    raw = _get_batch_client(GEMINI_API_KEY).files.download(file=job.dest.file_name)
+    out = [f"ERROR: No response for this row in batch job {job.name}."] * n
+    for line in raw.decode("utf-8").splitlines():
+        if not line.strip():
+            continue
+        record = json.loads(line)
+        try:
+            idx = int(record.get("key"))
+        except (TypeError, ValueError):
+            continue
+        if 0 <= idx < n:
+            out[idx] = _batch_record_text(record)
+    _count_api_call(sum(1 for t in out if not t.startswith("ERROR")))
+    return out
 
 # =========================
 # ====== UTILITIES =========
@@ -77,23 +395,221 @@ def call_gemini(prompt: str) -> str:
 TOPIC_FILE = "hustle_topic.txt"
 
 def load_topic_from_file() -> str | None:
-    if os.path.exists(TOPIC_FILE):
-        try:
-            with open(TOPIC_FILE, "r", encoding="utf-8") as f:
-                return f.read().strip()
-        except Exception:
-            return None
-    return None
+    """Read TOPIC_FILE, reusing the session's copy until the file's mtime changes."""
+    try:
+        mtime = os.stat(TOPIC_FILE).st_mtime_ns
+    except OSError:
+        return None
+    cached = st.session_state.get("_topic_cache")
+    if cached and cached[0] == mtime:
+        return cached[1]
+    try:
+        with open(TOPIC_FILE, "r", encoding="utf-8") as f:
+            topic = f.read().strip()
+    except Exception:
+        return None
+    st.session_state["_topic_cache"] = (mtime, topic)
+    return topic
 
 def save_topic_to_file(topic: str):
+    """
+    Persist the topic atomically (temp file + os.replace). Skipped when the
+    file still holds exactly this text, per the session's mtime-keyed cache.
+    """
+    topic = topic.strip()
+    if load_topic_from_file() == topic:
+        return
+    tmp = TOPIC_FILE + ".tmp"
     try:
-        with open(TOPIC_FILE, "w", encoding="utf-8") as f:
-            f.write(topic.strip())
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(topic)
+        os.replace(tmp, TOPIC_FILE)
+        st.session_state["_topic_cache"] = (os.stat(TOPIC_FILE).st_mtime_ns, topic)
     except Exception:
+        st.session_state.pop("_topic_cache", None)
+
+HAS_PYARROW = importlib.util.find_spec("pyarrow") is not None
+
+UPLOAD_CACHE_ENTRIES = 4  # parsed uploads kept in memory across sessions (matches UPLOAD_SPOOL_KEEP)
+UPLOAD_CACHE_TTL = 3600  # seconds a parsed upload stays cached
+
+@st.cache_data(show_spinner=False, max_entries=UPLOAD_CACHE_ENTRIES, ttl=UPLOAD_CACHE_TTL)
+def _parse_upload(file_id: str, _upload) -> pd.DataFrame:
+    # file_id is unique and stable for an upload's lifetime, so it is the whole
+    # cache key; the file object itself is never hashed and only read on a miss.
+    if HAS_PYARROW:
+        # Arrow's multi-threaded reader is several times faster on large files,
+        # but stricter; anything it rejects gets a second try with the C engine.
+        try:
+            _upload.seek(0)
+            return pd.read_csv(_upload, engine="pyarrow")
+        except Exception:
+            pass
+    _upload.seek(0)
+    return pd.read_csv(_upload)
+
+UPLOAD_SPOOL_MIN_BYTES = 50 * 1024 * 1024  # larger uploads are spooled to disk, not parsed whole
+UPLOAD_SPOOL_DIR = os.path.join(tempfile.gettempdir(), "hustlehub_uploads")
+UPLOAD_SPOOL_KEEP = 4  # most recent spooled uploads kept on disk; older ones are deleted
+
+def _remove_quietly(path: str):
+    try:
+        os.remove(path)
+    except OSError:
         pass
 
-def df_has_columns(df: pd.DataFrame, cols: list[str]) -> bool:
-    return all(c in df.columns for c in cols)
+@st.cache_resource
+def _spool_registry() -> tuple[dict[str, str], threading.Lock]:
+    """Process-wide {file_id: path} of spooled uploads (oldest first), deleted at exit."""
+    spooled: dict[str, str] = {}
+
+    def _cleanup():
+        for path in list(spooled.values()):
+            _remove_quietly(path)
+
+    atexit.register(_cleanup)
+    return spooled, threading.Lock()
+
+def _spool_upload(file_id: str, upload) -> str:
+    """
+    Copy an upload to a temp file once per file_id (1 MiB at a time) and
+    return its path. The copy is redone if the file has since vanished (e.g.
+    temp cleanup), and only the UPLOAD_SPOOL_KEEP newest copies are kept.
+    """
+    spooled, lock = _spool_registry()
+    with lock:
+        path = spooled.pop(file_id, None)
+        if path is None or not os.path.exists(path):
+            os.makedirs(UPLOAD_SPOOL_DIR, exist_ok=True)
+            path = os.path.join(UPLOAD_SPOOL_DIR, f"{file_id}.csv")
+            upload.seek(0)
+            with open(path, "wb") as f:
+                shutil.copyfileobj(upload, f, length=1 << 20)
+        spooled[file_id] = path  # (re)inserted as the most recent
+        while len(spooled) > UPLOAD_SPOOL_KEEP:
+            _remove_quietly(spooled.pop(next(iter(spooled))))
+    return path
+
+def read_uploaded_csv(upload) -> pd.DataFrame | str | None:
+    """
+    Parse an st.file_uploader upload once rather than on every rerun. Uploads
+    over UPLOAD_SPOOL_MIN_BYTES are spooled to disk instead and returned as a
+    path, which the batch tools read in chunks without ever holding a fully
+    parsed copy in memory.
+    """
+    if upload is None:
+        return None
+    if upload.size > UPLOAD_SPOOL_MIN_BYTES:
+        return _spool_upload(upload.file_id, upload)
+    return _parse_upload(upload.file_id, upload)
+
+PRODUCT_COLUMNS = ("Title", "Features", "Keywords")
+LEAD_COLUMNS = ("Business_Name", "Product_Focus", "AI_Pitch_Sample")
+CSV_WRITE_CHUNKSIZE = 10_000  # rows serialized per to_csv chunk
+
+def _write_atomically(path: str, write):
+    """
+    write(tmp) into a per-thread temp file, then os.replace it over path, so
+    readers (and overlapping saves) only ever see a complete file. Best effort.
+    """
+    tmp = f"{path}.{threading.get_ident()}.tmp"
+    try:
+        write(tmp)
+        os.replace(tmp, path)
+    except Exception:
+        _remove_quietly(tmp)
+
+def save_df_in_background(df: pd.DataFrame, csv_path: str):
+    """
+    Write df to csv_path (plus a zstd Parquet copy when pyarrow is installed)
+    on a daemon thread so serialization doesn't block the UI. Best effort,
+    like the inline writes it replaces.
+    """
+    def _write():
+        _write_atomically(csv_path, lambda tmp: df.to_csv(tmp, index=False, chunksize=CSV_WRITE_CHUNKSIZE))
+        if HAS_PYARROW:
+            _write_atomically(
+                os.path.splitext(csv_path)[0] + ".parquet",
+                lambda tmp: df.to_parquet(tmp, index=False, compression="zstd"),
+            )
+
+    threading.Thread(target=_write, daemon=True).start()
+
+def df_has_columns(df: pd.DataFrame, cols) -> bool:
+    return set(cols).issubset(df.columns)
+
+def text_column(col: pd.Series) -> pd.Series:
+    """
+    A column as plain str with blank cells as ''. astype(str) alone keeps
+    missing values as NaN on pandas 3, which poisons string concatenation.
+    """
+    return col.fillna("").astype(str)
+
+def rows_as_dicts(df: pd.DataFrame, cols) -> list[dict]:
+    """
+    One {col: str} dict per row. Coerces to str once for the whole frame (blank
+    cells become '', see text_column) and walks plain tuples (itertuples)
+    rather than boxing each row as a Series.
+    """
+    cols = list(cols)
+    return [dict(zip(cols, t)) for t in df[cols].fillna("").astype(str).itertuples(index=False, name=None)]
+
+PROCESS_CHUNK_ROWS = 500  # rows read and sent to the model per chunk by the batch tools
+
+def iter_row_chunks(df: pd.DataFrame):
+    """Split an in-memory frame into PROCESS_CHUNK_ROWS slices (views, not copies)."""
+    for i in range(0, max(len(df), 1), PROCESS_CHUNK_ROWS):
+        yield df.iloc[i:i + PROCESS_CHUNK_ROWS]
+
+def iter_source_chunks(source: pd.DataFrame | str):
+    """
+    Row chunks from an in-memory frame, or from a CSV path via a chunked read.
+    Lazy: the file is opened on the first chunk and closed when the generator
+    finishes or is closed.
+    """
+    if isinstance(source, pd.DataFrame):
+        yield from iter_row_chunks(source)
+        return
+    with pd.read_csv(source, chunksize=PROCESS_CHUNK_ROWS) as reader:
+        yield from reader
+
+def process_in_chunks(chunks, required, process, on_progress=None,
+                      source_name: str = "CSV") -> pd.DataFrame | str:
+    """
+    Run process() over an iterable of row chunks (see iter_source_chunks) so
+    only one chunk of raw input is resident at a time.
+    Columns are validated on the first chunk, before any model calls, and
+    on_progress(rows_done) is called after each chunk. Read and processing
+    failures come back as distinct ERROR strings naming source_name; the
+    chunk iterator is closed however the run ends.
+    """
+    done: list[pd.DataFrame] = []
+    rows_done = 0
+    it = iter(chunks)
+    try:
+        while True:
+            try:
+                chunk = next(it)
+            except StopIteration:
+                break
+            except Exception as e:
+                return f"ERROR: Failed to read {source_name}: {e}"
+            if not done and not df_has_columns(chunk, required):
+                return f"ERROR: Missing required columns. Need {list(required)}"
+            try:
+                done.append(process(chunk))
+            except Exception as e:
+                return f"ERROR: Failed to process {source_name}: {e}"
+            rows_done += len(chunk)
+            if on_progress is not None:
+                on_progress(rows_done)
+    finally:
+        close = getattr(it, "close", None)
+        if close is not None:
+            close()
+    if not done:
+        return "ERROR: No rows to process."
+    return pd.concat(done)
 
 def save_text_download_button(label: str, text: str, filename: str):
     """Offer a download button for text output."""
@@ -107,14 +623,68 @@ def save_text_download_button(label: str, text: str, filename: str):
         mime="text/plain",
     )
 
+def render_text_output(key: str, stream_prompt: str | None, download_label: str, filename: str, empty_msg: str):
+    """
+    Output block for single-prompt text tools: stream a fresh response when
+    stream_prompt is given (and store it under outputs[key]), otherwise show
+    the stored one.
+    """
+    if stream_prompt:
+        text = st.write_stream(stream_gemini(stream_prompt))
+        st.session_state.outputs[key] = text
+    else:
+        text = st.session_state.outputs.get(key)
+        if text:
+            st.code(text)
+    if text:
+        save_text_download_button(download_label, text, filename)
+    else:
+        st.info(empty_msg)
+
+def progress_reporter(total: int | None):
+    """Progress bar for chunked batch tools; returns the on_progress callback and the bar."""
+    bar = st.progress(0.0, text="Starting...")
+
+    def report(rows_done: int):
+        if total:
+            bar.progress(min(rows_done / total, 1.0), text=f"Processed {rows_done:,} of {total:,} rows")
+        else:
+            bar.progress(0.0, text=f"Processed {rows_done:,} rows")
+
+    return report, bar
+
+@st.cache_data(show_spinner=False, max_entries=8)
+def _df_to_bytes(df: pd.DataFrame, fmt: str) -> bytes | None:
+    """
+    Serialize once per distinct table, not on every render of its download button.
+    Parquet returns None when Arrow rejects the table (e.g. an object column
+    mixing ints and strings after chunked reads); that result is cached too.
+    """
+    if fmt == "parquet":
+        buf = io.BytesIO()
+        try:
+            df.to_parquet(buf, index=False, compression="zstd", compression_level=3)
+        except Exception:
+            return None
+        return buf.getvalue()
+    return df.to_csv(index=False).encode("utf-8")
+
 def save_csv_download_button(label: str, df: pd.DataFrame, filename: str):
-    """Offer a download button for CSV output."""
+    """Offer a download button for CSV output, plus a zstd Parquet one when pyarrow can write the table."""
     if df is None or df.empty:
         return
-    buf = io.BytesIO(df.to_csv(index=False).encode("utf-8"))
+    parquet = _df_to_bytes(df, "parquet") if HAS_PYARROW else None
+    if parquet is not None:
+        parquet_name = os.path.splitext(filename)[0] + ".parquet"
+        st.download_button(
+            f"💾 Download {parquet_name} (smaller)",
+            data=parquet,
+            file_name=parquet_name,
+            mime="application/vnd.apache.parquet",
+        )
     st.download_button(
         label,
-        data=buf,
+        data=_df_to_bytes(df, "csv"),
         file_name=filename,
         mime="text/csv",
     )
@@ -124,193 +694,436 @@ def save_csv_download_button(label: str, df: pd.DataFrame, filename: str):
 # =========================
 
 # 1) Niche / Topic Generator
+_TOPIC_PROMPT = (
+    "You are an expert market analyst. Identify a single, highly specific, "
+    "low-competition niche for a digital product or content side hustle. "
+    "Output ONLY the niche idea itself."
+)
+
 def fn_topic_generator(topic_override: str | None = None) -> str:
     """Generate a niche topic. If topic_override exists, just echo it politely."""
     if topic_override:
         return f"(Using provided topic)\n{topic_override}"
-    prompt = (
-        "You are an expert market analyst. Identify a single, highly specific, "
-        "low-competition niche for a digital product or content side hustle. "
-        "Output ONLY the niche idea itself."
-    )
-    return call_gemini(prompt)
+    # The prompt never varies, so a cached answer would repeat the same niche forever.
+    return call_gemini(_TOPIC_PROMPT, use_cache=False)
+
+NO_TOPIC_ERROR = "ERROR: No topic provided and 'hustle_topic.txt' not found."
+
+def resolve_topic(topic: str | None) -> str | None:
+    return topic or load_topic_from_file()
 
 # 2) AI Ghostwriter (Long-Form)
-def fn_long_form(topic: str | None) -> str:
-    if not topic:
-        topic = load_topic_from_file()
-    if not topic:
-        return "ERROR: No topic provided and 'hustle_topic.txt' not found."
-    prompt = (
+def long_form_prompt(topic: str) -> str:
+    return (
         f"As a professional Ghostwriter, create a detailed, 5-section long-form article outline "
         f"for the niche: {topic}. The outline should be SEO-friendly and ready for script creation."
     )
-    return call_gemini(prompt)
 
 # 3) AI Ghostwriter (Short-Form)
-def fn_short_form(topic: str | None) -> str:
-    if not topic:
-        topic = load_topic_from_file()
-    if not topic:
-        return "ERROR: No topic provided and 'hustle_topic.txt' not found."
-    prompt = (
+def short_form_prompt(topic: str) -> str:
+    return (
         f"Based on the niche: {topic}, generate a 5-point FAQ list and a 3-sentence summary "
         f"for a short-form video (like a TikTok/Reel)."
     )
-    return call_gemini(prompt)
 
 # 4) Social Media Captions
-def fn_captions(topic: str | None) -> str:
-    if not topic:
-        topic = load_topic_from_file()
-    if not topic:
-        return "ERROR: No topic provided and 'hustle_topic.txt' not found."
-    prompt = (
+def captions_prompt(topic: str) -> str:
+    return (
         f"Generate three high-impact captions for the niche: {topic}. One for Instagram, "
         f"one for X/Twitter, and one for LinkedIn. Format clearly with platform headers."
     )
-    return call_gemini(prompt)
 
 # 5) SEO Product Automator
-def fn_product_automator(cpd: str | None, uploaded_csv: pd.DataFrame | None = None) -> pd.DataFrame | str:
+# Invariant instructions, built once and shared by the per-row and batched prompts.
+_PRODUCT_PREFIX = "You are an expert e-commerce copywriter. Write a compelling, SEO-optimized product description.\n"
+_CPD_HINT = "Consider this current/previous description for improvement ideas: "
+
+def _product_batch_preamble(cpd: str | None) -> str:
+    preamble = _PRODUCT_PREFIX + "Write one for each product below, using its Title, Features and Keywords."
+    if cpd:
+        preamble += f"\n{_CPD_HINT}{cpd}"
+    return preamble
+
+def _build_product_prompts(df: pd.DataFrame, cpd: str | None) -> list[str]:
+    """Assemble one prompt per row with column-wise string ops instead of a row loop."""
+    prompts = (
+        _PRODUCT_PREFIX
+        + "Product: " + text_column(df["Title"]) + "\n"
+        + "Features: " + text_column(df["Features"]) + "\n"
+        + "Keywords: " + text_column(df["Keywords"]) + "\n"
+    )
+    suffix = f"{_CPD_HINT}{cpd}\n" if cpd else ""
+    return (prompts + (suffix + "Output ONLY the new description.")).tolist()
+
+def fn_product_automator(cpd: str | None, uploaded_csv: pd.DataFrame | str | None = None,
+                         rows_per_prompt: int = GEMINI_BATCH_SIZE, on_progress=None) -> pd.DataFrame | str:
     """
-    Uses uploaded dataframe or input.csv fallback.
+    Uses uploaded dataframe (or spooled upload path) or input.csv fallback; files are read in chunks.
     Requires columns: Title, Features, Keywords
     Adds 'Generated_Description'.
     If CPD provided (Current Product Description), it will be included in the prompt context.
+    rows_per_prompt rows share each model request (1 = one request per row).
+    on_progress(rows_done) is called as each chunk finishes.
     """
-    df: pd.DataFrame | None = None
-    if uploaded_csv is not None:
-        df = uploaded_csv.copy()
-    elif os.path.exists("input.csv"):
-        try:
-            df = pd.read_csv("input.csv")
-        except Exception as e:
-            return f"ERROR: Failed to read input.csv: {e}"
-    else:
+    if uploaded_csv is None and not os.path.exists("input.csv"):
         return "ERROR: No data provided. Upload a CSV or place 'input.csv' in working directory."
 
-    needed = ["Title", "Features", "Keywords"]
-    if not df_has_columns(df, needed):
-        return f"ERROR: Missing required columns. Need {needed}"
-
-    out = []
-    for _, row in df.iterrows():
-        title = str(row["Title"])
-        features = str(row["Features"])
-        keywords = str(row["Keywords"])
-        prompt = (
-            "You are an expert e-commerce copywriter. Write a compelling, SEO-optimized product description.\n"
-            f"Product: {title}\n"
-            f"Features: {features}\n"
-            f"Keywords: {keywords}\n"
-        )
-        if cpd:
-            prompt += f"Consider this current/previous description for improvement ideas: {cpd}\n"
-        prompt += "Output ONLY the new description."
-        text = call_gemini(prompt)
-        out.append(text)
-
-    df = df.copy()
-    df["Generated_Description"] = out
-    try:
-        df.to_csv("output.csv", index=False)
-    except Exception:
-        pass
+    preamble = _product_batch_preamble(cpd)
+
+    def process(chunk: pd.DataFrame) -> pd.DataFrame:
+        items = rows_as_dicts(chunk, PRODUCT_COLUMNS)
+        out = call_gemini_batched(preamble, items, _build_product_prompts(chunk, cpd), rows_per_prompt)
+        return chunk.assign(Generated_Description=out)
+
+    source = uploaded_csv if uploaded_csv is not None else "input.csv"
+    source_name = "input.csv" if uploaded_csv is None else "uploaded CSV"
+    df = process_in_chunks(iter_source_chunks(source), PRODUCT_COLUMNS, process, on_progress, source_name)
+    if isinstance(df, str):
+        return df
+
+    save_df_in_background(df, "output.csv")
     return df
 
 # 6) Lead Processor / Outreach
-def fn_leads_processor(business_name: str | None, uploaded_csv: pd.DataFrame | None = None) -> pd.DataFrame | str:
+_LEAD_PREFIX = "You are a professional outreach specialist. Draft a personalized, high-conversion cold email pitch.\n"
+_LEAD_GUIDANCE = (
+    "Start professionally. Mention their focus area, then integrate your offer naturally.\n"
+    "End with a clear, low-friction CTA. Sign off as RuralJoe."
+)
+_LEAD_ROW_SUFFIX = _LEAD_GUIDANCE + " Output ONLY the email body."
+_LEAD_BATCH_PREAMBLE = (
+    _LEAD_PREFIX
+    + "Write one for each target business below (AI_Pitch_Sample is your offer, based on their Product_Focus).\n"
+    + _LEAD_GUIDANCE + " Each element is ONLY the email body."
+)
+
+def _build_lead_prompts(df: pd.DataFrame) -> list[str]:
+    """Assemble one outreach prompt per row with column-wise string ops."""
+    prompts = (
+        _LEAD_PREFIX
+        + "Target Business: " + text_column(df["Business_Name"]) + "\n"
+        + "Their Focus: " + text_column(df["Product_Focus"]) + "\n"
+        + "Your Offer (based on their focus): " + text_column(df["AI_Pitch_Sample"]) + "\n"
+        + _LEAD_ROW_SUFFIX
+    )
+    return prompts.tolist()
+
+LEAD_BATCH_JOB_KEY = "lead_batch_job"  # session_state slot: {"name": job name, "rows": input rows}
+
+def _finish_leads(df: pd.DataFrame | str) -> pd.DataFrame | str:
+    if isinstance(df, pd.DataFrame):
+        save_df_in_background(df, "processed_leads.csv")
+    return df
+
+def fetch_lead_batch_results(max_wait: float = 0) -> pd.DataFrame | str:
     """
-    Uses uploaded dataframe or leads.csv fallback.
+    Check the session's pending lead Batch API job, waiting up to max_wait
+    seconds. Once it has finished, its emails are merged into the stored rows
+    and the job is no longer pending; until then a status message is returned.
+    """
+    pending = st.session_state.get(LEAD_BATCH_JOB_KEY)
+    if not pending:
+        return "ERROR: No batch job pending."
+    try:
+        job = wait_gemini_batch_job(pending["name"], max_wait)
+        if job.state.name not in _BATCH_DONE_STATES:
+            return (
+                f"Batch job {job.name} is {job.state.name}. Jobs can take up to 24 hours; "
+                "use 'Fetch batch results' to collect it later."
+            )
+        rows = pending["rows"]
+        emails = read_gemini_batch_results(job, len(rows))
+    except Exception as e:
+        return f"ERROR: Could not check batch job {pending['name']}: {e}"
+    del st.session_state[LEAD_BATCH_JOB_KEY]
+    return _finish_leads(rows.assign(Generated_Email=emails, Status="Processed"))
+
+def _leads_via_batch_api(chunks, process, on_progress, source_name: str) -> pd.DataFrame | str:
+    """
+    Write one Batch API request per lead to a JSONL file, chunk by chunk, and
+    submit it as a single job (see fetch_lead_batch_results). Runs below
+    BATCH_API_MIN_ROWS rows go through process() interactively instead, and
+    only those report on_progress.
+    """
+    if st.session_state.get(LEAD_BATCH_JOB_KEY):
+        return "ERROR: A batch job is already pending. Fetch its results first."
+    fd, jsonl_path = tempfile.mkstemp(prefix="hustlehub-batch-", suffix=".jsonl")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            written = 0
+
+            def write_requests(chunk: pd.DataFrame) -> pd.DataFrame:
+                nonlocal written
+                for prompt in _build_lead_prompts(chunk):
+                    f.write(_batch_request_line(written, prompt))
+                    written += 1
+                return chunk
+
+            # No progress here: writing requests isn't generating emails, and a full
+            # bar would then sit at 100% while the job runs.
+            df = process_in_chunks(chunks, LEAD_COLUMNS, write_requests, None, source_name)
+        if isinstance(df, str):
+            return df
+        if len(df) < BATCH_API_MIN_ROWS:
+            return _finish_leads(process_in_chunks([df], LEAD_COLUMNS, process, on_progress, source_name))
+        name = submit_gemini_batch_job(jsonl_path)
+    except Exception as e:
+        return f"ERROR: Could not submit batch job: {e}"
+    finally:
+        _remove_quietly(jsonl_path)
+    st.session_state[LEAD_BATCH_JOB_KEY] = {"name": name, "rows": df}
+    return fetch_lead_batch_results(BATCH_API_MAX_WAIT)
+
+def fn_leads_processor(business_name: str | None, uploaded_csv: pd.DataFrame | str | None = None,
+                       use_batch_api: bool = False, rows_per_prompt: int = GEMINI_BATCH_SIZE,
+                       on_progress=None) -> pd.DataFrame | str:
+    """
+    Uses uploaded dataframe (or spooled upload path) or leads.csv fallback; files are read in chunks.
     Requires columns: Business_Name, Product_Focus, AI_Pitch_Sample
     Adds 'Generated_Email' and 'Status'
     If a single business_name is provided without CSVs, we’ll attempt a minimal single-row run.
+    With use_batch_api and at least BATCH_API_MIN_ROWS rows, the emails are generated
+    by one Gemini Batch API job (cheaper, but may finish long after this call returns).
+    Otherwise rows_per_prompt rows share each model request (1 = one request per row).
+    on_progress(rows_done) is called as each chunk finishes.
     """
-    df: pd.DataFrame | None = None
+    def process(chunk: pd.DataFrame) -> pd.DataFrame:
+        items = rows_as_dicts(chunk, LEAD_COLUMNS)
+        emails = call_gemini_batched(_LEAD_BATCH_PREAMBLE, items, _build_lead_prompts(chunk), rows_per_prompt)
+        return chunk.assign(Generated_Email=emails, Status="Processed")
+
+    source_name = "leads.csv" if uploaded_csv is None else "uploaded CSV"
     if uploaded_csv is not None:
-        df = uploaded_csv.copy()
+        chunks = iter_source_chunks(uploaded_csv)
     elif os.path.exists("leads.csv"):
-        try:
-            df = pd.read_csv("leads.csv")
-        except Exception as e:
-            return f"ERROR: Failed to read leads.csv: {e}"
+        chunks = iter_source_chunks("leads.csv")
     elif business_name:
         # Single-row fallback with placeholders
-        df = pd.DataFrame(
+        chunks = [pd.DataFrame(
             [{"Business_Name": business_name, "Product_Focus": "N/A", "AI_Pitch_Sample": "Custom AI services."}]
-        )
+        )]
     else:
         return "ERROR: No leads data found. Upload a CSV or place 'leads.csv' in working directory."
 
-    needed = ["Business_Name", "Product_Focus", "AI_Pitch_Sample"]
-    if not df_has_columns(df, needed):
-        return f"ERROR: Missing required columns. Need {needed}"
-
-    emails = []
-    for _, row in df.iterrows():
-        bname = str(row["Business_Name"])
-        focus = str(row["Product_Focus"])
-        pitch = str(row["AI_Pitch_Sample"])
-        prompt = (
-            "You are a professional outreach specialist. Draft a personalized, high-conversion cold email pitch.\n"
-            f"Target Business: {bname}\n"
-            f"Their Focus: {focus}\n"
-            f"Your Offer (based on their focus): {pitch}\n"
-            "Start professionally. Mention their focus area, then integrate your offer naturally.\n"
-            "End with a clear, low-friction CTA. Sign off as RuralJoe. Output ONLY the email body."
-        )
-        text = call_gemini(prompt)
-        emails.append(text)
+    if use_batch_api and batch_api_available():
+        return _leads_via_batch_api(chunks, process, on_progress, source_name)
+    return _finish_leads(process_in_chunks(chunks, LEAD_COLUMNS, process, on_progress, source_name))
 
-    df = df.copy()
-    df["Generated_Email"] = emails
-    df["Status"] = "Processed"
+# 7) Ethical Scraper / Data Collector
+SCRAPER_USER_AGENT = "AI_HustleHubBot/1.0 (+contact: you@example.com)"
+SCRAPER_TIMEOUT = (3.05, 15)  # (connect, read) seconds
+SCRAPER_MAX_BYTES = 2 * 1024 * 1024  # never buffer more than this per page
+# lxml's C parser is several times faster than the pure-Python html.parser;
+# fall back gracefully when it isn't installed.
+HAS_LXML = importlib.util.find_spec("lxml") is not None
+if HAS_LXML:
+    from lxml import etree as lxml_etree
+SCRAPER_PARSER = "lxml" if HAS_LXML else "html.parser"
+SCRAPER_SNIFF_BYTES = 256 * 1024  # prefix the stdlib fallback sniffer looks at
+# Only build nodes fn_scraper actually reads; everything else is skipped at parse time.
+SCRAPER_STRAINER = SoupStrainer(["title", "meta", "h1", "h2", "h3", "a"])
+
+@st.cache_resource
+def _http_session() -> requests.Session:
+    """Keep-alive session shared across reruns so repeat scrapes reuse pooled connections."""
+    session = requests.Session()
+    session.headers.update({"User-Agent": SCRAPER_USER_AGENT})
+    adapter = HTTPAdapter(
+        pool_connections=10,
+        pool_maxsize=20,
+        max_retries=Retry(total=2, backoff_factor=0.3),
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+class _SniffState:
+    """
+    Tracks whether everything fn_scraper extracts (title, meta description,
+    10 headings, 15 links) has fully arrived, so the rest of the page need
+    not be downloaded. Subclasses feed it tags via sniff(bytes).
+    """
+
+    def __init__(self):
+        self.title_done = False
+        self.meta_done = False
+        self.headings = 0
+        self.links = 0
+        self._in_link = False
+
+    def _start(self, tag, get_attr):
+        if tag == "a":
+            self._in_link = get_attr("href") is not None
+        elif tag == "meta" and get_attr("name") == "description":
+            self.meta_done = True
+        elif tag == "body":
+            # Title and meta live in <head>; nothing more to wait for.
+            self.title_done = self.meta_done = True
+
+    def _end(self, tag):
+        if tag in ("h1", "h2", "h3"):
+            self.headings += 1
+        elif tag == "a" and self._in_link:
+            self.links += 1
+            self._in_link = False
+        elif tag == "title":
+            self.title_done = True
+
+    @property
+    def complete(self) -> bool:
+        return self.title_done and self.meta_done and self.headings >= 10 and self.links >= 15
+
+class _LxmlSniffer(_SniffState):
+    """Incremental pass in lxml's C parser (HTMLPullParser)."""
+
+    def __init__(self):
+        super().__init__()
+        self._parser = lxml_etree.HTMLPullParser(events=("start", "end"))
+
+    def sniff(self, data: bytes):
+        self._parser.feed(data)
+        for event, el in self._parser.read_events():
+            if not isinstance(el.tag, str):  # comments, processing instructions
+                continue
+            if event == "start":
+                self._start(el.tag, el.get)
+            else:
+                self._end(el.tag)
+
+class _StdlibSniffer(_SniffState, HTMLParser):
+    """Pure-Python fallback when lxml isn't installed; only run over a short prefix."""
+
+    def __init__(self):
+        _SniffState.__init__(self)
+        HTMLParser.__init__(self, convert_charrefs=False)
+
+    def handle_starttag(self, tag, attrs):
+        self._start(tag, dict(attrs).get)
+
+    def handle_endtag(self, tag):
+        self._end(tag)
+
+    def sniff(self, data: bytes):
+        # latin-1 never fails and keeps ASCII markup intact, which is all the
+        # sniffer looks at; BeautifulSoup does the real decoding later.
+        self.feed(data.decode("latin-1"))
+
+def _read_page(r: requests.Response, limit: int) -> bytes:
+    """
+    Read a streamed response until the sniffer has seen everything fn_scraper
+    needs, or `limit` bytes, whichever comes first. Without lxml, sniffing
+    stops after SCRAPER_SNIFF_BYTES so slow Python parsing stays off the
+    rest of the download.
+    """
+    sniffer = _LxmlSniffer() if HAS_LXML else _StdlibSniffer()
+    sniff_limit = limit if HAS_LXML else SCRAPER_SNIFF_BYTES
+    buf = bytearray()
+    for chunk in r.iter_content(chunk_size=16 * 1024):
+        sniffing = len(buf) < sniff_limit
+        buf += chunk
+        if sniffing:
+            try:
+                sniffer.sniff(chunk)
+            except Exception:
+                sniff_limit = 0  # unparseable prefix: just read to the limit
+            if sniffer.complete:
+                break
+        if len(buf) >= limit:
+            break
+    return bytes(buf[:limit])
+
+SCRAPER_MAX_WORKERS = 10  # concurrent fetches in fn_scraper_many; keeps us polite to target hosts
+SCRAPE_ACK_ERROR = (
+    "ERROR: Please acknowledge you are responsible for checking the target site's robots.txt "
+    "and Terms before scraping."
+)
+
+_URL_RE = re.compile(r"^https?://[^\s/]+\.[^\s]+", re.I)
+
+SCRAPER_MAX_REDIRECTS = 5  # hops followed (each one re-checked) before giving up
+
+@st.cache_data(show_spinner=False, ttl=300)
+def _host_addresses(host: str) -> list[str]:
+    """Resolve host once (cached); raises OSError on failure, which is never cached."""
+    return [info[4][0].split("%", 1)[0] for info in socket.getaddrinfo(host, None)]
+
+def _host_error(host: str) -> str | None:
+    """Refuse hosts that don't resolve or resolve to non-public addresses; None means OK."""
     try:
-        df.to_csv("processed_leads.csv", index=False)
-    except Exception:
-        pass
-    return df
+        addrs = _host_addresses(host)
+    except OSError as e:
+        return f"ERROR: Could not resolve host '{host}': {e}"
+    for addr in map(ipaddress.ip_address, addrs):
+        if not addr.is_global:
+            return f"ERROR: Refusing to scrape non-public address {addr} for '{host}'."
+    return None
 
-# 7) Ethical Scraper / Data Collector
-def fn_scraper(url: str, acknowledge: bool) -> dict | str:
+def _url_error(url: str) -> str | None:
+    """Fail fast on typos and internal hosts instead of burning the network timeout."""
+    if not _URL_RE.match(url):
+        return f"ERROR: Invalid URL (expected http(s)://host/...): {url}"
+    return _host_error(urlsplit(url).hostname or "")
+
+def _get_checked(session: requests.Session, url: str) -> requests.Response | str:
     """
-    Adds a non-default User-Agent and requires user acknowledgement to check robots.txt/TOS.
-    Returns a dict with basic page intel (title, meta, top headers, top links).
+    Streamed GET that follows redirects by hand, running every Location
+    through _url_error, so a public URL can't bounce the scraper onto an
+    internal address. Returns the final response or an ERROR string.
     """
-    if not url:
-        return "ERROR: WEBSITE (URL) is required."
-    if not acknowledge:
-        return ("ERROR: Please acknowledge you are responsible for checking the target site's robots.txt "
-                "and Terms before scraping.")
+    for _ in range(SCRAPER_MAX_REDIRECTS + 1):
+        r = session.get(url, timeout=SCRAPER_TIMEOUT, stream=True, allow_redirects=False)
+        if not r.is_redirect:
+            return r
+        r.close()
+        url = urljoin(url, r.headers["Location"])
+        err = _url_error(url)
+        if err:
+            return f"ERROR: Redirect blocked: {err.removeprefix('ERROR: ')}"
+    return f"ERROR: Too many redirects (more than {SCRAPER_MAX_REDIRECTS})."
+
+def _scrape_one(session: requests.Session, url: str) -> dict | str:
+    """Fetch one page and return its basic intel dict, or an ERROR string."""
+    url = url.strip()
+    url_err = _url_error(url)
+    if url_err:
+        return url_err
 
-    headers = {
-        "User-Agent": "AI_HustleHubBot/1.0 (+contact: you@example.com)"
-    }
     try:
-        r = requests.get(url, headers=headers, timeout=15)
-        r.raise_for_status()
+        r = _get_checked(session, url)
+        if isinstance(r, str):
+            return r
+        with r:
+            r.raise_for_status()
+            body = _read_page(r, SCRAPER_MAX_BYTES)
     except Exception as e:
         return f"ERROR: Request failed: {e}"
 
-    soup = BeautifulSoup(r.text, "html.parser")
+    # Only trust the header charset when the server actually declared one;
+    # otherwise let BeautifulSoup sniff <meta charset> from the bytes.
+    declared = "charset=" in r.headers.get("Content-Type", "").lower()
+    soup = BeautifulSoup(
+        body, SCRAPER_PARSER,
+        parse_only=SCRAPER_STRAINER,
+        from_encoding=r.encoding if declared else None,
+    )
 
     title = (soup.title.string.strip() if soup.title and soup.title.string else "")
     meta_desc = ""
-    meta = soup.find("meta", attrs={"name": "description"}) or soup.find("meta", attrs={"property": "og:description"})
+    # name="description" wins over og:description; both lookups run on the strained tree.
+    meta = soup.select_one('meta[name="description"]') or soup.select_one('meta[property="og:description"]')
     if meta and meta.get("content"):
         meta_desc = meta["content"][:300]
 
     # Top headings
     h_tags = []
-    for tag in soup.find_all(["h1", "h2", "h3"])[:10]:
+    for tag in soup.find_all(["h1", "h2", "h3"], limit=10):
         txt = (tag.get_text(separator=" ", strip=True) or "")[:120]
         if txt:
             h_tags.append(f"{tag.name.upper()}: {txt}")
 
     # Top links (same host or overall top few)
     links = []
-    for a in soup.find_all("a", href=True)[:15]:
+    for a in soup.find_all("a", href=True, limit=15):
         txt = (a.get_text(separator=" ", strip=True) or "")[:80]
         href = a["href"]
         links.append({"text": txt, "href": href})
@@ -325,6 +1138,32 @@ def fn_scraper(url: str, acknowledge: bool) -> dict | str:
         "final_url": r.url,
     }
 
+def fn_scraper(url: str, acknowledge: bool) -> dict | str:
+    """
+    Adds a non-default User-Agent and requires user acknowledgement to check robots.txt/TOS.
+    Returns a dict with basic page intel (title, meta, top headers, top links).
+    """
+    if not url:
+        return "ERROR: WEBSITE (URL) is required."
+    if not acknowledge:
+        return SCRAPE_ACK_ERROR
+    return _scrape_one(_http_session(), url)
+
+def fn_scraper_many(urls: list[str], acknowledge: bool) -> dict[str, dict | str] | str:
+    """
+    Scrape several URLs concurrently over the shared pooled session, so total
+    time tracks the slowest page rather than the sum. Returns {url: result}.
+    """
+    urls = list(dict.fromkeys(u.strip() for u in urls if u and u.strip()))
+    if not urls:
+        return "ERROR: WEBSITE (URL) is required."
+    if not acknowledge:
+        return SCRAPE_ACK_ERROR
+    session = _http_session()
+    with ThreadPoolExecutor(max_workers=min(SCRAPER_MAX_WORKERS, len(urls))) as ex:
+        results = ex.map(lambda u: _scrape_one(session, u), urls)
+        return dict(zip(urls, results))
+
 # =========================
 # ========= UI =============
 # =========================
@@ -340,18 +1179,94 @@ with st.sidebar:
     st.markdown("---")
     st.markdown("### 📟 API Usage")
     st.metric("Successful API Calls (this session)", st.session_state.api_calls)
-    st.caption("Counts only successful model responses.")
+    st.caption(f"Counts only successful model responses; cached prompts ({GEMINI_CACHE_DIR}/) are free.")
+    st.slider(
+        "Max concurrent Gemini requests", 1, 16, GEMINI_MAX_WORKERS,
+        key="gemini_concurrency",
+        help="Start low (Gemini caps concurrent requests per tier); raise it if your tier allows.",
+    )
     st.markdown("---")
     st.caption("Each tool below has its own input {block} → output {block} on the main page.")
 
+def refresh_api_counter(calls_before: int):
+    """
+    Panels run as fragments, so the sidebar counter only redraws on a full
+    run; trigger one when this panel's run made billed Gemini calls.
+    """
+    if st.session_state.api_calls != calls_before:
+        st.rerun(scope="app")
+
+def panel_columns(title: str):
+    """Section heading plus the standard { Input } | { Output } column pair."""
+    st.markdown(f"### {title} {{ Input → Output }}")
+    return st.container().columns([1, 1.2], vertical_alignment="top")
+
+# Single-prompt topic tools (2-4) share one panel layout; only these details differ.
+TEXT_TOOLS = [
+    {
+        "title": "2) Ghostwriter — Long Form", "label": "Long-Form", "key": "long_form",
+        "prompt": long_form_prompt, "input_key": "topic_long_input",
+        "button": "📝 Generate Long-Form Outline", "button_key": "btn_long_form",
+        "success": "Generated long-form outline.", "noun": "long-form tool",
+    },
+    {
+        "title": "3) Ghostwriter — Short Form", "label": "Short-Form", "key": "short_form",
+        "prompt": short_form_prompt, "input_key": "topic_short_input",
+        "button": "🎬 Generate Short-Form Prep", "button_key": "btn_short_form",
+        "success": "Generated short-form prep.", "noun": "short-form tool",
+    },
+    {
+        "title": "4) Social Media Captions", "label": "Captions", "key": "captions",
+        "prompt": captions_prompt, "input_key": "topic_caps_input",
+        "button": "📸 Generate Captions", "button_key": "btn_caps",
+        "success": "Generated captions.", "noun": "captions tool",
+    },
+]
+
+@st.fragment
+def render_text_tool_panel(tool: dict):
+    calls_before = st.session_state.api_calls
+    in_col, out_col = panel_columns(tool["title"])
+    with in_col:
+        st.markdown(f"**{{ Input }} {tool['label']}**")
+        topic_input = st.text_input(
+            "Topic / Niche",
+            key=tool["input_key"],
+            placeholder="If blank, will try hustle_topic.txt"
+        )
+        stream_prompt = None
+        if st.button(tool["button"], key=tool["button_key"]):
+            topic = resolve_topic(topic_input if topic_input else None)
+            if topic:
+                stream_prompt = tool["prompt"](topic)
+            else:
+                st.session_state.outputs[tool["key"]] = NO_TOPIC_ERROR
+
+    with out_col:
+        st.markdown(f"**{{ Output }} {tool['label']}**")
+        render_text_output(
+            tool["key"], stream_prompt, f"💾 Download {tool['label']} as .txt", f"{tool['key']}.txt",
+            f"Run the {tool['noun']} to see output here.",
+        )
+        if stream_prompt:
+            in_col.success(tool["success"])
+
+    st.markdown("---")
+    refresh_api_counter(calls_before)
+
 st.title("🧰 AI HustleHub — Per-Tool Panels")
 
 # For visual “{ input } → { output }” mapping, each tool gets a container
-# with two columns: LEFT = input {block}, RIGHT = output {block}
-
-st.markdown("### 1) Niche / Topic Generator { Input → Output }")
-with st.container():
-    in_col, out_col = st.columns([1, 1.2], vertical_alignment="top")
+# with two columns: LEFT = input {block}, RIGHT = output {block}.
+# Each panel is an st.fragment, so interacting with one tool reruns only that
+# panel instead of the whole script; a panel that made Gemini calls then asks
+# for one full rerun so the sidebar counter stays current.
+
+@st.fragment
+def _panel_topic():
+    """Niche / topic generator; auto-saves the result to TOPIC_FILE."""
+    calls_before = st.session_state.api_calls
+    in_col, out_col = panel_columns("1) Niche / Topic Generator")
     with in_col:
         st.markdown("**{ Input } Niche / Topic**")
         topic_input_1 = st.text_input(
@@ -376,90 +1291,20 @@ with st.container():
             save_text_download_button("💾 Download Topic as .txt", t_out, "topic.txt")
         else:
             st.info("Run the generator to see output here.")
+    refresh_api_counter(calls_before)
 
-st.markdown("---")
-
-st.markdown("### 2) Ghostwriter — Long Form { Input → Output }")
-with st.container():
-    in_col, out_col = st.columns([1, 1.2], vertical_alignment="top")
-    with in_col:
-        st.markdown("**{ Input } Long-Form**")
-        topic_input_long = st.text_input(
-            "Topic / Niche",
-            key="topic_long_input",
-            placeholder="If blank, will try hustle_topic.txt"
-        )
-        if st.button("📝 Generate Long-Form Outline", key="btn_long_form"):
-            out = fn_long_form(topic_input_long if topic_input_long else None)
-            st.session_state.outputs["long_form"] = out
-            st.success("Generated long-form outline.")
-
-    with out_col:
-        st.markdown("**{ Output } Long-Form**")
-        long_out = st.session_state.outputs.get("long_form")
-        if long_out:
-            st.code(long_out)
-            save_text_download_button("💾 Download Long-Form as .txt", long_out, "long_form.txt")
-        else:
-            st.info("Run the long-form tool to see output here.")
+_panel_topic()
 
 st.markdown("---")
 
-st.markdown("### 3) Ghostwriter — Short Form { Input → Output }")
-with st.container():
-    in_col, out_col = st.columns([1, 1.2], vertical_alignment="top")
-    with in_col:
-        st.markdown("**{ Input } Short-Form**")
-        topic_input_short = st.text_input(
-            "Topic / Niche",
-            key="topic_short_input",
-            placeholder="If blank, will try hustle_topic.txt"
-        )
-        if st.button("🎬 Generate Short-Form Prep", key="btn_short_form"):
-            out = fn_short_form(topic_input_short if topic_input_short else None)
-            st.session_state.outputs["short_form"] = out
-            st.success("Generated short-form prep.")
-
-    with out_col:
-        st.markdown("**{ Output } Short-Form**")
-        short_out = st.session_state.outputs.get("short_form")
-        if short_out:
-            st.code(short_out)
-            save_text_download_button("💾 Download Short-Form as .txt", short_out, "short_form.txt")
-        else:
-            st.info("Run the short-form tool to see output here.")
-
-st.markdown("---")
-
-st.markdown("### 4) Social Media Captions { Input → Output }")
-with st.container():
-    in_col, out_col = st.columns([1, 1.2], vertical_alignment="top")
-    with in_col:
-        st.markdown("**{ Input } Captions**")
-        topic_input_caps = st.text_input(
-            "Topic / Niche",
-            key="topic_caps_input",
-            placeholder="If blank, will try hustle_topic.txt"
-        )
-        if st.button("📸 Generate Captions", key="btn_caps"):
-            out = fn_captions(topic_input_caps if topic_input_caps else None)
-            st.session_state.outputs["captions"] = out
-            st.success("Generated captions.")
-
-    with out_col:
-        st.markdown("**{ Output } Captions**")
-        caps_out = st.session_state.outputs.get("captions")
-        if caps_out:
-            st.code(caps_out)
-            save_text_download_button("💾 Download Captions as .txt", caps_out, "captions.txt")
-        else:
-            st.info("Run the captions tool to see output here.")
-
-st.markdown("---")
+for tool in TEXT_TOOLS:
+    render_text_tool_panel(tool)
 
-st.markdown("### 5) SEO Product Automator { Input → Output }")
-with st.container():
-    in_col, out_col = st.columns([1, 1.2], vertical_alignment="top")
+@st.fragment
+def _panel_products():
+    """SEO product automator over an uploaded CSV or input.csv."""
+    calls_before = st.session_state.api_calls
+    in_col, out_col = panel_columns("5) SEO Product Automator")
     with in_col:
         st.markdown("**{ Input } Products CSV + CPD**")
         cpd_input = st.text_area(
@@ -473,10 +1318,17 @@ with st.container():
             type=["csv"],
             key="upload_products_per_tool"
         )
-        df_products = pd.read_csv(up_products) if up_products is not None else None
+        df_products = read_uploaded_csv(up_products)
+        products_rpp = st.slider(
+            "Rows per prompt", 1, 16, GEMINI_BATCH_SIZE,
+            key="products_rows_per_prompt",
+            help="Products sent to Gemini in one request. Higher = fewer calls; lower = shorter, more reliable replies.",
+        )
 
         if st.button("🛒 Generate Product Descriptions", key="btn_products"):
-            out = fn_product_automator(cpd_input if cpd_input else None, df_products)
+            report, bar = progress_reporter(len(df_products) if isinstance(df_products, pd.DataFrame) else None)
+            out = fn_product_automator(cpd_input if cpd_input else None, df_products, products_rpp, report)
+            bar.empty()
             st.session_state.outputs["products"] = out
             st.success("Processed products.")
 
@@ -485,18 +1337,23 @@ with st.container():
         prod_out = st.session_state.outputs.get("products")
         if isinstance(prod_out, pd.DataFrame):
             st.dataframe(prod_out, use_container_width=True)
-            st.caption("Saved to output.csv (if write-permitted).")
+            st.caption("Saved to output.csv (and output.parquet with pyarrow) if write-permitted.")
             save_csv_download_button("💾 Download output.csv", prod_out, "output.csv")
         elif isinstance(prod_out, str):
             st.code(prod_out)
         else:
             st.info("Run the product automator to see output here.")
+    refresh_api_counter(calls_before)
+
+_panel_products()
 
 st.markdown("---")
 
-st.markdown("### 6) Lead Processor / Outreach { Input → Output }")
-with st.container():
-    in_col, out_col = st.columns([1, 1.2], vertical_alignment="top")
+@st.fragment
+def _panel_leads():
+    """Lead processor / outreach emails over an uploaded CSV or leads.csv."""
+    calls_before = st.session_state.api_calls
+    in_col, out_col = panel_columns("6) Lead Processor / Outreach")
     with in_col:
         st.markdown("**{ Input } Leads CSV / Business Name**")
         business_name_input = st.text_input(
@@ -509,38 +1366,67 @@ with st.container():
             type=["csv"],
             key="upload_leads_per_tool"
         )
-        df_leads = pd.read_csv(up_leads) if up_leads is not None else None
+        df_leads = read_uploaded_csv(up_leads)
+        use_batch_api = st.checkbox(
+            f"Use Gemini Batch API (≥{BATCH_API_MIN_ROWS} rows, ~50% cheaper, slower)",
+            value=False,
+            key="use_batch_api",
+            disabled=not batch_api_available(),
+        )
+        leads_rpp = st.slider(
+            "Rows per prompt", 1, 16, GEMINI_BATCH_SIZE,
+            key="leads_rows_per_prompt",
+            help="Leads sent to Gemini in one request. Higher = fewer calls; lower = shorter, more reliable replies.",
+        )
 
         if st.button("📧 Generate Outreach Emails", key="btn_leads"):
-            out = fn_leads_processor(
-                business_name_input if business_name_input else None,
-                df_leads
-            )
+            report, bar = progress_reporter(len(df_leads) if isinstance(df_leads, pd.DataFrame) else None)
+            with st.spinner("Generating emails..."):
+                out = fn_leads_processor(
+                    business_name_input if business_name_input else None,
+                    df_leads,
+                    use_batch_api=use_batch_api,
+                    rows_per_prompt=leads_rpp,
+                    on_progress=report,
+                )
+            bar.empty()
             st.session_state.outputs["leads"] = out
             st.success("Processed leads.")
 
+        pending_job = st.session_state.get(LEAD_BATCH_JOB_KEY)
+        if pending_job:
+            st.caption(f"Batch job `{pending_job['name']}` is pending for {len(pending_job['rows']):,} leads.")
+            if st.button("📥 Fetch batch results", key="btn_leads_fetch_batch"):
+                with st.spinner("Checking batch job..."):
+                    st.session_state.outputs["leads"] = fetch_lead_batch_results()
+
     with out_col:
         st.markdown("**{ Output } Leads**")
         leads_out = st.session_state.outputs.get("leads")
         if isinstance(leads_out, pd.DataFrame):
             st.dataframe(leads_out, use_container_width=True)
-            st.caption("Saved to processed_leads.csv (if write-permitted).")
+            st.caption("Saved to processed_leads.csv (and .parquet with pyarrow) if write-permitted.")
             save_csv_download_button("💾 Download processed_leads.csv", leads_out, "processed_leads.csv")
         elif isinstance(leads_out, str):
             st.code(leads_out)
         else:
             st.info("Run the lead processor to see output here.")
+    refresh_api_counter(calls_before)
+
+_panel_leads()
 
 st.markdown("---")
 
-st.markdown("### 7) Ethical Scraper / Data Collector { Input → Output }")
-with st.container():
-    in_col, out_col = st.columns([1, 1.2], vertical_alignment="top")
+@st.fragment
+def _panel_scraper():
+    """Ethical scraper snapshot for one URL, or several fetched concurrently."""
+    in_col, out_col = panel_columns("7) Ethical Scraper / Data Collector")
     with in_col:
-        st.markdown("**{ Input } Website URL**")
-        WEBSITE = st.text_input(
-            "WEBSITE (URL to Scrape)",
+        st.markdown("**{ Input } Website URL(s)**")
+        WEBSITE = st.text_area(
+            "WEBSITE (URL to Scrape — one per line for several)",
             key="website_input",
+            height=80,
             placeholder="https://example.com/trends"
         )
         st.warning("Before scraping: **You are responsible** for checking robots.txt and site Terms.")
@@ -551,7 +1437,11 @@ with st.container():
         )
 
         if st.button("🌐 Generate Scrape / Data Snapshot", key="btn_scrape"):
-            out = fn_scraper(WEBSITE, ack_scrape)
+            urls = WEBSITE.split()
+            if len(urls) > 1:
+                out = fn_scraper_many(urls, ack_scrape)  # fetched concurrently
+            else:
+                out = fn_scraper(urls[0] if urls else "", ack_scrape)
             st.session_state.outputs["scraper"] = out
             st.success("Scraper run completed.")
 
@@ -565,6 +1455,8 @@ with st.container():
         else:
             st.info("Run the scraper to see output here.")
 
+_panel_scraper()
+
 # ===== Footer =====
 st.markdown("---")
 st.caption("Each tool has its own {input} → {output} panel. Stay ethical with scraping. 🚦")
@@ -1,6 +1,8 @@
 import tkinter as tk
 from tkinter import ttk, scrolledtext
-import csv
+import importlib.util
+
+import pandas as pd
 
 # --- 1. The Fixed Email Template (Your Closing/Pitch Structure) ---
 EMAIL_TEMPLATE = """
@@ -21,27 +23,45 @@ Thank you for your time,
 RuralJoe
 """
 
+_SEP = '-' * 50
+# The template split once around its single placeholder; every email body is
+# _BODY_HEAD + pitch + _BODY_TAIL, for one lead or a whole column at a time.
+_BODY_HEAD, _BODY_TAIL = EMAIL_TEMPLATE.split('*[AI_PITCH_SAMPLE_PLACEHOLDER]*')
+SUBJECT_PREFIX = "Local AI: Automating Descriptions for Your "
+HAS_PYARROW = importlib.util.find_spec("pyarrow") is not None
+
 # --- 2. Data Storage ---
-LEAD_DATA = []
+LEAD_DATA = pd.DataFrame()  # one column per CSV field, one row per lead
+
+GENERATE_DEBOUNCE_MS = 150  # wait for arrow-key scrolling to settle before building an email
+_pending_generate = None  # Tk 'after' id of the scheduled generation, if any
+
+# Widgets shared with the callbacks; created by build_gui().
+root = listbox_leads = text_output = label_status = None
 
 # --- 3. Core Functions ---
 
 def load_leads_from_csv(file_path='leads.csv'):
-    """Reads the CSV file and populates the global LEAD_DATA list."""
+    """Reads the CSV file into the global LEAD_DATA DataFrame."""
     global LEAD_DATA
-    LEAD_DATA = []  # Clear previous data
+    LEAD_DATA = pd.DataFrame()  # Clear previous data
 
     try:
-        with open(file_path, mode='r', encoding='utf-8') as file:
-            # Assumes CSV columns: Business_Name, Contact_Email, Product_Focus, AI_Pitch_Sample
-            reader = csv.DictReader(file)
-            for row in reader:
-                LEAD_DATA.append(row)
-
-        # Populate the Listbox with business names
-        listbox_leads.delete(0, tk.END)
-        for i, lead in enumerate(LEAD_DATA):
-            listbox_leads.insert(tk.END, f"{i+1}. {lead.get('Business_Name', 'N/A')}")
+        # Assumes CSV columns: Business_Name, Contact_Email, Product_Focus, AI_Pitch_Sample
+        # Kept as plain strings (blank cells stay '') so emails read exactly as the sheet does.
+        LEAD_DATA = pd.read_csv(file_path, encoding='utf-8', dtype=str, keep_default_na=False)
+
+        # Populate the Listbox with business names (one Tk call for all rows)
+        if 'Business_Name' in LEAD_DATA.columns:
+            names = LEAD_DATA['Business_Name']
+        else:
+            names = pd.Series('N/A', index=LEAD_DATA.index)
+        items = (pd.Series(range(1, len(LEAD_DATA) + 1), index=LEAD_DATA.index).astype(str)
+                 + '. ' + names).tolist()
+        if listbox_leads is not None:
+            listbox_leads.delete(0, tk.END)
+            if items:
+                listbox_leads.insert(tk.END, *items)
 
         update_status(f"Successfully loaded {len(LEAD_DATA)} leads.")
 
@@ -51,25 +71,34 @@ def load_leads_from_csv(file_path='leads.csv'):
         update_status(f"ERROR loading CSV: {e}")
 
 def generate_email_on_click(event):
-    """Generates the full email when a lead is clicked in the listbox."""
+    """Debounces <<ListboxSelect>>: only the selection that settles gets an email."""
+    global _pending_generate
+    if _pending_generate is not None:
+        root.after_cancel(_pending_generate)
+    _pending_generate = root.after(GENERATE_DEBOUNCE_MS, generate_selected_email)
+
+def generate_selected_email():
+    """Generates the full email for the lead currently selected in the listbox."""
+    global _pending_generate
+    _pending_generate = None
     try:
         # Get the index of the selected item
         selected_index = listbox_leads.curselection()[0]
-        lead = LEAD_DATA[selected_index]
+        business_name = LEAD_DATA.at[selected_index, 'Business_Name']
 
         # 1. Assemble the Subject Line
-        subject_line = f"Local AI: Automating Descriptions for Your {lead['Product_Focus']}"
+        subject_line = f"{SUBJECT_PREFIX}{LEAD_DATA.at[selected_index, 'Product_Focus']}"
 
         # 2. Assemble the Email Body (using the placeholder)
-        email_body = EMAIL_TEMPLATE.replace('*[AI_PITCH_SAMPLE_PLACEHOLDER]*', lead['AI_Pitch_Sample'])
+        email_body = _BODY_HEAD + LEAD_DATA.at[selected_index, 'AI_Pitch_Sample'] + _BODY_TAIL
 
         # 3. Format the final output for the text box
         final_output = (
-            f"**LEAD: {lead['Business_Name'].upper()} **\n"
-            f"{'-'*50}\n"
-            f"**TO:** {lead['Contact_Email']}\n"
+            f"**LEAD: {business_name.upper()} **\n"
+            f"{_SEP}\n"
+            f"**TO:** {LEAD_DATA.at[selected_index, 'Contact_Email']}\n"
             f"**SUBJECT:** {subject_line}\n"
-            f"{'-'*50}\n"
+            f"{_SEP}\n"
             f"*** COPY EMAIL BODY BELOW ***\n\n"
             f"{email_body}"
         )
@@ -77,59 +106,93 @@ def generate_email_on_click(event):
         # Insert into the read-only output box
         text_output.delete("1.0", tk.END)
         text_output.insert(tk.END, final_output)
-        update_status(f"Email generated for: {lead['Business_Name']}")
+        update_status(f"Email generated for: {business_name}")
 
     except IndexError:
         update_status("Please select a lead to generate the email.")
     except Exception as e:
         update_status(f"Generation ERROR: {e}")
 
+def generate_all_emails(output_base='generated_emails'):
+    """Builds every lead's subject and body in one column-wise pass and saves them."""
+    if LEAD_DATA.empty:
+        update_status("Load leads first, then generate all emails.")
+        return
+    try:
+        df = LEAD_DATA.assign(
+            Subject=SUBJECT_PREFIX + LEAD_DATA['Product_Focus'],
+            Email_Body=_BODY_HEAD + LEAD_DATA['AI_Pitch_Sample'] + _BODY_TAIL,
+        )
+
+        if HAS_PYARROW:
+            path = f"{output_base}.parquet"
+            df.to_parquet(path, index=False, compression='zstd')
+        else:
+            path = f"{output_base}.csv"
+            df.to_csv(path, index=False)
+        update_status(f"Generated {len(df)} emails -> {path}")
+    except KeyError as e:
+        update_status(f"Generation ERROR: missing column {e}")
+    except Exception as e:
+        update_status(f"Generation ERROR: {e}")
+
 def update_status(message):
     """Updates the status bar at the bottom of the GUI."""
-    label_status.config(text=f"Status: {message}")
+    if label_status is not None:
+        label_status.config(text=f"Status: {message}")
 
 
 # --- 4. GUI Setup (Assuming this is added to your main Tkinter window) ---
 
-# We'll assume 'root' is your main Tkinter window instance
-root = tk.Tk()
-root.title("Joe's AI Hustle Hub - Email List Processor")
+def build_gui():
+    """Creates the main window and its widgets; nothing Tk-related happens at import."""
+    global root, listbox_leads, text_output, label_status
+
+    root = tk.Tk()
+    root.title("Joe's AI Hustle Hub - Email List Processor")
+
+    # Create a container frame
+    frame_main = ttk.Frame(root, padding="10")
+    frame_main.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
+
+    # --- Left Side: Lead List ---
+    label_list = ttk.Label(frame_main, text="Leads (Click to Generate Email):")
+    label_list.grid(row=0, column=0, sticky=tk.W, pady=(0, 5))
 
-# Create a container frame
-frame_main = ttk.Frame(root, padding="10")
-frame_main.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
+    listbox_leads = tk.Listbox(frame_main, height=20, width=50)
+    listbox_leads.grid(row=1, column=0, rowspan=3, sticky=(tk.W, tk.E))
+    listbox_leads.bind('<<ListboxSelect>>', generate_email_on_click) # Bind the click event
 
-# --- Left Side: Lead List ---
-label_list = ttk.Label(frame_main, text="Leads (Click to Generate Email):")
-label_list.grid(row=0, column=0, sticky=tk.W, pady=(0, 5))
+    scrollbar_leads = ttk.Scrollbar(frame_main, orient=tk.VERTICAL, command=listbox_leads.yview)
+    scrollbar_leads.grid(row=1, column=1, rowspan=3, sticky=(tk.N, tk.S))
+    listbox_leads['yscrollcommand'] = scrollbar_leads.set
 
-listbox_leads = tk.Listbox(frame_main, height=20, width=50)
-listbox_leads.grid(row=1, column=0, rowspan=3, sticky=(tk.W, tk.E))
-listbox_leads.bind('<<ListboxSelect>>', generate_email_on_click) # Bind the click event
+    # Button to load the data
+    btn_load = ttk.Button(frame_main, text="Load Leads.csv", command=load_leads_from_csv)
+    btn_load.grid(row=4, column=0, pady=(10, 0), sticky=tk.W)
 
-scrollbar_leads = ttk.Scrollbar(frame_main, orient=tk.VERTICAL, command=listbox_leads.yview)
-scrollbar_leads.grid(row=1, column=1, rowspan=3, sticky=(tk.N, tk.S))
-listbox_leads['yscrollcommand'] = scrollbar_leads.set
+    btn_generate_all = ttk.Button(frame_main, text="Generate All Emails", command=generate_all_emails)
+    btn_generate_all.grid(row=4, column=0, pady=(10, 0), sticky=tk.E)
 
-# Button to load the data
-btn_load = ttk.Button(frame_main, text="Load Leads.csv", command=load_leads_from_csv)
-btn_load.grid(row=4, column=0, pady=(10, 0), sticky=tk.W)
 
+    # --- Right Side: Output Area ---
+    label_output = ttk.Label(frame_main, text="Generated Email (Copy & Paste):")
+    label_output.grid(row=0, column=2, sticky=tk.W, pady=(0, 5), padx=(10, 0))
 
-# --- Right Side: Output Area ---
-label_output = ttk.Label(frame_main, text="Generated Email (Copy & Paste):")
-label_output.grid(row=0, column=2, sticky=tk.W, pady=(0, 5), padx=(10, 0))
+    text_output = scrolledtext.ScrolledText(frame_main, wrap=tk.WORD, height=25, width=70)
+    text_output.grid(row=1, column=2, rowspan=4, sticky=(tk.W, tk.E), padx=(10, 0))
 
-text_output = scrolledtext.ScrolledText(frame_main, wrap=tk.WORD, height=25, width=70)
-text_output.grid(row=1, column=2, rowspan=4, sticky=(tk.W, tk.E), padx=(10, 0))
 
+    # --- Status Bar ---
+    label_status = ttk.Label(root, text="Status: Ready. Load 'leads.csv'.", relief=tk.SUNKEN, anchor=tk.W)
+    label_status.grid(row=1, column=0, sticky=(tk.W, tk.E))
 
-# --- Status Bar ---
-label_status = ttk.Label(root, text="Status: Ready. Load 'leads.csv'.", relief=tk.SUNKEN, anchor=tk.W)
-label_status.grid(row=1, column=0, sticky=(tk.W, tk.E))
+    return root
 
 
 # Run the application
-# If you are integrating this into a larger hub, you would remove root.mainloop()
-# and instead call the setup functions within your main hub class.
-# root.mainloop()
+# If you are integrating this into a larger hub, import this module and call
+# build_gui() from your main hub instead of running it directly.
+if __name__ == '__main__':
+    build_gui()
+    root.mainloop()